@@ -0,0 +1,457 @@
+import csv
+import json
+import math
+import os
+import socket
+import time
+from collections import OrderedDict, deque
+
+import pandas as pd
+
+from ingest import load_limits, load_table
+
+# ------------------------
+# Alert rule engine
+#   python alerts.py [results file] [limits file] [alerts.jsonl]
+#   python alerts.py --follow results.csv limits.csv alerts.jsonl
+# ------------------------
+# Every rule keeps only fixed-size state per parameter (a deque with maxlen
+# is the ring buffer), so the cost of a row never depends on how much
+# history has already gone through the engine.
+
+
+def make_event(rule, row, message):
+    return {
+        "ts": time.time(),
+        "rule": rule,
+        "param": row.get("param_name"),
+        "part": row.get("uniquepart_id"),
+        "value": row.get("result"),
+        "row_timestamp": row.get("result_timestamp"),
+        "message": message,
+    }
+
+
+# ------------------------
+# Rules
+# ------------------------
+class LimitBreach:
+    """Fire when a result is outside its parameter's OK band."""
+
+    name = "limit_breach"
+
+    def __init__(self, limits):
+        self.limits = limits
+
+    def check(self, row):
+        lim = self.limits.get(row["param_name"])
+        if lim is None:
+            return []
+        low, high = lim
+        value = row["result"]
+        if value < low or value > high:
+            return [make_event(self.name, row, f"{value} outside [{low}, {high}]")]
+        return []
+
+
+class ConsecutiveOOS:
+    """Fire when at least `n` of the last `m` results of a parameter are OOS."""
+
+    name = "n_of_m_oos"
+
+    def __init__(self, limits, n=3, m=5):
+        self.limits = limits
+        self.n = n
+        self.m = m
+        self.windows = {}
+        self.counts = {}
+
+    def check(self, row):
+        param = row["param_name"]
+        lim = self.limits.get(param)
+        if lim is None:
+            return []
+
+        window = self.windows.get(param)
+        if window is None:
+            window = self.windows[param] = deque(maxlen=self.m)
+            self.counts[param] = 0
+
+        oos = not (lim[0] <= row["result"] <= lim[1])
+        # Keep the OOS count in step with the ring buffer instead of re-summing it
+        if len(window) == self.m and window[0]:
+            self.counts[param] -= 1
+        window.append(oos)
+        self.counts[param] += oos
+
+        if oos and self.counts[param] >= self.n:
+            return [make_event(self.name, row, f"{self.counts[param]} of last {len(window)} out of spec")]
+        return []
+
+
+class RateOfChange:
+    """Fire when a result moves more than `max_delta` from the previous one.
+
+    `max_delta` is either a number or a {param_name: delta} dict; parameters
+    missing from the dict are not checked.
+    """
+
+    name = "rate_of_change"
+
+    def __init__(self, max_delta):
+        self.max_delta = max_delta
+        self.last = {}
+
+    def check(self, row):
+        param = row["param_name"]
+        value = row["result"]
+        delta_limit = (
+            self.max_delta.get(param) if isinstance(self.max_delta, dict) else self.max_delta
+        )
+        previous = self.last.get(param)
+        self.last[param] = value
+
+        if delta_limit is None or previous is None:
+            return []
+        delta = value - previous
+        if abs(delta) > delta_limit:
+            return [make_event(self.name, row, f"changed by {delta:+g} (max {delta_limit:g})")]
+        return []
+
+
+class MissingParameter:
+    """Fire when a part is closed without a result for every expected parameter.
+
+    Results for a part arrive as a run of rows. A part is closed once
+    `window_rows` rows have arrived since its own last row (by default four
+    parts' worth, 4 * number of expected parameters), or when `flush()` is
+    called at the end of the stream. Closed parts are remembered in an LRU of
+    `closed_memory` ids; rows for them (re-tests, or a run split by a long
+    gap) are ignored instead of reopening the part with an empty set.
+    """
+
+    name = "missing_parameter"
+
+    def __init__(self, expected_params, window_rows=None, closed_memory=10_000):
+        self.expected = frozenset(expected_params)
+        self.window_rows = window_rows or 4 * max(len(self.expected), 1)
+        self.closed_memory = closed_memory
+        # part -> [params seen, row number of its last row], oldest first
+        self.open_parts = OrderedDict()
+        self.closed = OrderedDict()
+        self.rows = 0
+
+    def check(self, row):
+        self.rows += 1
+        part = row["uniquepart_id"]
+
+        if part in self.closed:
+            self.closed.move_to_end(part)
+        else:
+            entry = self.open_parts.get(part)
+            if entry is None:
+                entry = self.open_parts[part] = [set(), 0]
+            else:
+                self.open_parts.move_to_end(part)
+            entry[0].add(row["param_name"])
+            entry[1] = self.rows
+
+        events = []
+        while self.open_parts:
+            oldest, (seen, last_row) = next(iter(self.open_parts.items()))
+            if self.rows - last_row < self.window_rows:
+                break
+            del self.open_parts[oldest]
+            events.extend(self._close(oldest, seen))
+        return events
+
+    def flush(self):
+        events = []
+        while self.open_parts:
+            part, (seen, _) = self.open_parts.popitem(last=False)
+            events.extend(self._close(part, seen))
+        return events
+
+    def _close(self, part, seen):
+        self.closed[part] = None
+        if len(self.closed) > self.closed_memory:
+            self.closed.popitem(last=False)
+
+        missing = self.expected - seen
+        if not missing:
+            return []
+        row = {"uniquepart_id": part}
+        return [
+            make_event(self.name, dict(row, param_name=p), "no result for part")
+            for p in sorted(missing)
+        ]
+
+
+# ------------------------
+# Sinks
+# ------------------------
+class FileSink:
+    """Append events as JSON lines, flushed per event so tailers see them."""
+
+    def __init__(self, path):
+        self.f = open(path, "a", encoding="utf-8")
+
+    def emit(self, event):
+        self.f.write(json.dumps(event, default=str) + "\n")
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class UdpSink:
+    """Send each event as one JSON datagram to a local listener."""
+
+    def __init__(self, host="127.0.0.1", port=9999):
+        self.addr = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def emit(self, event):
+        self.sock.sendto(json.dumps(event, default=str).encode("utf-8"), self.addr)
+
+    def close(self):
+        self.sock.close()
+
+
+# ------------------------
+# Engine
+# ------------------------
+class AlertEngine:
+    def __init__(self, rules, sinks=()):
+        self.rules = rules
+        self.sinks = list(sinks)
+
+    def process(self, row):
+        """Evaluate one result row against every rule and emit its events."""
+        events = []
+        for rule in self.rules:
+            events.extend(rule.check(row))
+        self._emit(events)
+        return events
+
+    def flush(self):
+        events = []
+        for rule in self.rules:
+            if hasattr(rule, "flush"):
+                events.extend(rule.flush())
+        self._emit(events)
+        return events
+
+    def _emit(self, events):
+        for event in events:
+            for sink in self.sinks:
+                sink.emit(event)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def default_engine(limits, sinks=(), n=3, m=5):
+    # The OK band width is the natural step size; a jump of more than one
+    # band (or more than 1 for single-value limits) is worth a look
+    max_delta = {p: max(high - low, 1.0) for p, (low, high) in limits.items()}
+    return AlertEngine(
+        [
+            LimitBreach(limits),
+            ConsecutiveOOS(limits, n=n, m=m),
+            RateOfChange(max_delta),
+            MissingParameter(limits.keys()),
+        ],
+        sinks,
+    )
+
+
+# ------------------------
+# Row sources
+# ------------------------
+REQUIRED = ("uniquepart_id", "param_name", "result")
+
+
+def parse_row(columns, line):
+    """Parse one CSV line into a row dict, or None if it lacks the required fields."""
+    fields = next(csv.reader([line]), [])
+    row = dict(zip(columns, fields))
+    if any(not row.get(key, "").strip() for key in REQUIRED):
+        return None
+    try:
+        row["result"] = float(row["result"])
+    except ValueError:
+        return None
+    # float() accepts "nan" and "inf"; neither is a measurement
+    if not math.isfinite(row["result"]):
+        return None
+    return row
+
+
+def read_offset(offset_file):
+    try:
+        with open(offset_file) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def save_offset(offset_file, offset):
+    tmp = f"{offset_file}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(str(offset))
+    os.replace(tmp, offset_file)
+
+
+def parse_header(line):
+    return [c.strip().lower() for c in next(csv.reader([line.decode("utf-8-sig")]), [])]
+
+
+def follow_csv(path, offset_file=None, poll=0.01, save_every=1000):
+    """Yield rows appended to a CSV after the follower starts (`tail -F`).
+
+    Following starts at the end of the file as it is when follow_csv is
+    called, so history already on disk is not alerted on again. With
+    `offset_file`, the byte offset past the last row handed out is saved
+    there (when the file goes idle, every `save_every` rows and when the
+    generator is closed), and a restart resumes from it instead; after a
+    crash at most `save_every` rows are evaluated again.
+
+    When the file is truncated or replaced (a new monthly export), every row
+    of the new file is followed from its header on. A file without a
+    complete header yet is followed from the start once the header arrives.
+    """
+    f = open(path, "rb")
+    header = f.readline()
+    if not header.endswith(b"\n"):
+        f.seek(0)
+        return _follow(path, f, None, 0, offset_file, poll, save_every)
+
+    offset = read_offset(offset_file) if offset_file else None
+    file_size = os.fstat(f.fileno()).st_size
+    if offset is None or not len(header) <= offset <= file_size:
+        offset = file_size
+    f.seek(offset)
+    return _follow(path, f, parse_header(header), offset, offset_file, poll, save_every)
+
+
+def _replaced(path, f):
+    """True once `path` is no longer the open file or is shorter than what was read."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        # Between unlink and rename of a replacement; look again next poll
+        return False
+    opened = os.fstat(f.fileno())
+    return (st.st_ino, st.st_dev) != (opened.st_ino, opened.st_dev) or st.st_size < f.tell()
+
+
+def _follow(path, f, columns, offset, offset_file, poll, save_every):
+    saved = offset
+    since_save = 0
+    pending = b""
+    try:
+        while True:
+            line = f.readline()
+            if not line:
+                if offset_file and saved != offset:
+                    save_offset(offset_file, offset)
+                    saved = offset
+                    since_save = 0
+                if _replaced(path, f):
+                    try:
+                        reopened = open(path, "rb")
+                    except FileNotFoundError:
+                        pass
+                    else:
+                        f.close()
+                        f = reopened
+                        columns, offset, pending = None, 0, b""
+                        continue
+                time.sleep(poll)
+                continue
+            pending += line
+            if not pending.endswith(b"\n"):
+                continue
+            offset += len(pending)
+            if columns is None:
+                columns = parse_header(pending)
+                pending = b""
+                continue
+            row = parse_row(columns, pending.decode("utf-8", errors="replace").rstrip("\r\n"))
+            pending = b""
+            if row is not None:
+                yield row
+
+            since_save += 1
+            if offset_file and since_save >= save_every:
+                save_offset(offset_file, offset)
+                saved = offset
+                since_save = 0
+    finally:
+        if offset_file and saved != offset:
+            save_offset(offset_file, offset)
+        f.close()
+
+
+def iter_rows(results_file):
+    results_df = load_table(results_file)
+    results_df.columns = results_df.columns.str.strip().str.lower()
+    results_df["result"] = pd.to_numeric(results_df["result"], errors="coerce")
+    results_df = results_df.dropna(subset=list(REQUIRED))
+    # Same rows as parse_row accepts on the live path
+    results_df = results_df[results_df["result"].map(math.isfinite)]
+    for row in results_df.to_dict("records"):
+        row["result"] = float(row["result"])
+        yield row
+
+
+def replay(engine, rows, report_every=100_000):
+    """Feed rows through `engine`, reporting per-row latency as history grows."""
+    latencies = []
+    total = 0
+    for row in rows:
+        start = time.perf_counter()
+        engine.process(row)
+        latencies.append(time.perf_counter() - start)
+        total += 1
+        if len(latencies) == report_every:
+            _report(total, latencies)
+            latencies = []
+    if latencies:
+        _report(total, latencies)
+    engine.flush()
+
+
+def _report(total, latencies):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    rate = len(latencies) / sum(latencies)
+    print(f"{total:>10,} rows  p50 {p50:6.1f}us  p99 {p99:6.1f}us  {rate:>10,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    follow = "--follow" in args
+    if follow:
+        args.remove("--follow")
+    results_file = args[0] if len(args) > 0 else "results.csv"
+    limits_file = args[1] if len(args) > 1 else "limits.csv"
+    alerts_file = args[2] if len(args) > 2 else os.devnull
+
+    engine = default_engine(load_limits(limits_file), [FileSink(alerts_file)])
+    try:
+        if follow:
+            # Resume after the last row handled by a previous --follow run
+            for row in follow_csv(results_file, offset_file=results_file + ".offset"):
+                engine.process(row)
+        else:
+            # Replay the sample many times over to show latency stays flat
+            rows = list(iter_rows(results_file))
+            replay(engine, (row for _ in range(500) for row in rows))
+    finally:
+        engine.close()
@@ -0,0 +1,124 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from dashboard_fast import load_merged, build_series, build_figure
+
+# ------------------------
+# Benchmark: notebook figure vs. high-volume figure
+#   python bench_dashboard.py [points_per_param ...]
+# ------------------------
+
+
+def legacy_figure(merged, selected_params):
+    """update_graph from notebooks-t1, copied as is (pandas objects passed
+    straight to plotly)."""
+    if not selected_params:
+        return go.Figure()
+
+    fig = make_subplots(
+        rows=len(selected_params),
+        cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        subplot_titles=selected_params
+    )
+
+    for i, param in enumerate(selected_params, start=1):
+        data = merged[merged["param_name"] == param].reset_index(drop=True)
+
+        low  = data["Lower OK"].iloc[0]
+        high = data["Upper OK"].iloc[0]
+
+        fig.add_trace(
+            go.Scatter(
+                x=data.index,
+                y=data["result"],
+                mode="lines+markers",
+                name=f"{param} Result",
+                customdata=data["uniquepart_id"],
+                hovertemplate="Part: %{customdata}<br>Value: %{y}<extra></extra>"
+            ),
+            row=i, col=1
+        )
+
+        oos = data[data["out_of_spec"]]
+        fig.add_trace(
+            go.Scatter(
+                x=oos.index,
+                y=oos["result"],
+                mode="markers",
+                marker=dict(color="red", size=8),
+                name="Out of Spec",
+                showlegend=(i == 1),
+                customdata=oos["uniquepart_id"],
+                hovertemplate="Part: %{customdata}<br>OOS: %{y}<extra></extra>"
+            ),
+            row=i, col=1
+        )
+
+        fig.add_hline(y=high, line_dash="dash", line_color="red", row=i, col=1)
+        fig.add_hline(y=low,  line_dash="dash", line_color="green", row=i, col=1)
+
+        fig.add_hrect(
+            y0=low,
+            y1=high,
+            fillcolor="green",
+            opacity=0.1,
+            line_width=0,
+            row=i, col=1
+        )
+
+    fig.update_layout(
+        height=300 * len(selected_params),
+        hovermode="x unified",
+        showlegend=True
+    )
+
+    return fig
+
+
+def scale_up(merged, points_per_param):
+    """Tile the sample data so every parameter has `points_per_param` rows."""
+    per_param = merged.groupby("param_name").size().min()
+    reps = int(np.ceil(points_per_param / per_param))
+    big = pd.concat([merged] * reps, ignore_index=True)
+    return big.groupby("param_name", sort=False).head(points_per_param)
+
+
+def measure(build):
+    start = time.perf_counter()
+    fig = build()
+    built = time.perf_counter()
+    payload = fig.to_json()
+    done = time.perf_counter()
+    return built - start, done - built, len(payload.encode("utf-8"))
+
+
+def run(points_per_param):
+    merged, parameters = load_merged()
+    merged = scale_up(merged, points_per_param)
+    params = list(parameters)
+
+    series = build_series(merged)
+    rows = {
+        "legacy": measure(lambda: legacy_figure(merged, params)),
+        "fast": measure(lambda: build_figure(series, params)),
+        # WebGL mode at any size, i.e. without per-point customdata
+        "fast gl": measure(lambda: build_figure(series, params, gl_threshold=0)),
+    }
+
+    print(f"\n{points_per_param:,} points per parameter, {len(params)} parameters")
+    print(f"{'figure':<9}{'build s':>10}{'to_json s':>12}{'payload MB':>13}")
+    for name, (build_s, json_s, size) in rows.items():
+        print(f"{name:<9}{build_s:>10.3f}{json_s:>12.3f}{size / 1e6:>13.2f}")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 100_000, 500_000]
+    for n in sizes:
+        run(n)
@@ -1,11 +1,13 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from ingest import load_table
+
 # =========================
 # Load Excel files
 # =========================
-results = pd.read_excel("results.xlsx")
-limits = pd.read_excel("limits.xlsx")
+results = load_table("results.xlsx")
+limits = load_table("limits.xlsx")
 
 # =========================
 # Clean column names
@@ -2,20 +2,12 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import os
 
+from ingest import load_table
+
 def load_data(file_name):
-    """Robustly loads data whether it is a true Excel file or a CSV."""
+    """Loads data by its real file type (Excel or CSV), cached after the first run."""
     try:
-        # Check the extension
-        if file_name.lower().endswith('.xlsx'):
-            # Try reading as a true Excel file first
-            try:
-                return pd.read_excel(file_name)
-            except Exception:
-                # If that fails, it might be a CSV renamed to .xlsx
-                # 'ISO-8859-1' fixes the UnicodeDecodeError you encountered
-                return pd.read_csv(file_name, encoding='ISO-8859-1', on_bad_lines='skip')
-        else:
-            return pd.read_csv(file_name, encoding='ISO-8859-1', on_bad_lines='skip')
+        return load_table(file_name)
     except Exception as e:
         print(f"Could not load {file_name}: {e}")
         return None
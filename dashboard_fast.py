@@ -0,0 +1,267 @@
+import stdlib_guard  # noqa: F401  (must come before dash)
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from dash import Dash, dcc, html, Input, Output, State
+
+# Above this many points per trace the figure switches to WebGL (Scattergl)
+# and part ids are no longer embedded per point.
+GL_THRESHOLD = 100_000
+
+# Everything one page load or callback reads, handed out as a single value
+# so a server can swap all of it at once (see serve.py)
+DashboardData = namedtuple("DashboardData", ["series", "parameters", "cube"])
+
+# ------------------------
+# Load data
+# ------------------------
+def load_file(filename):
+    return pd.read_csv(filename, encoding="utf-8-sig", on_bad_lines="skip")
+
+
+def load_merged(results_file="results.csv", limits_file="limits.csv"):
+    return merge_limits(load_file(results_file), load_file(limits_file))
+
+
+def merge_limits(results_df, limits_df):
+    results_df.columns = results_df.columns.str.strip().str.lower()
+    limits_df.columns = limits_df.columns.str.strip()
+
+    merged = results_df.merge(
+        limits_df[["param_name", "Lower OK", "Upper OK"]],
+        on="param_name",
+        how="left"
+    )
+
+    merged["out_of_spec"] = (
+        (merged["result"] < merged["Lower OK"]) |
+        (merged["result"] > merged["Upper OK"])
+    )
+    return merged, limits_df["param_name"].unique()
+
+
+# ------------------------
+# Per-parameter typed arrays
+# ------------------------
+def build_series(merged):
+    """Split `merged` once into numpy arrays per parameter.
+
+    Plotly encodes numpy arrays as base64 typed buffers ({"dtype", "bdata"})
+    instead of JSON number lists, so keeping the values numeric and compact
+    here is what shrinks the payload.
+    """
+    series = {}
+    for param, data in merged.groupby("param_name", sort=False):
+        result = pd.to_numeric(data["result"], errors="coerce").to_numpy(np.float32)
+        oos = data["out_of_spec"].to_numpy(bool)
+        series[param] = {
+            "result": result,
+            "oos_index": np.flatnonzero(oos).astype(np.uint32),
+            "part_id": data["uniquepart_id"].to_numpy(),
+            "low": data["Lower OK"].iloc[0],
+            "high": data["Upper OK"].iloc[0],
+        }
+    return series
+
+
+def build_figure(series, selected_params, gl_threshold=GL_THRESHOLD):
+    if not selected_params:
+        return go.Figure()
+
+    fig = make_subplots(
+        rows=len(selected_params),
+        cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        subplot_titles=selected_params
+    )
+
+    for i, param in enumerate(selected_params, start=1):
+        s = series[param]
+        n = len(s["result"])
+        oos_index = s["oos_index"]
+
+        if n > gl_threshold:
+            # High-volume mode: WebGL traces, no per-point customdata.
+            # Part ids are looked up on hover by the server (see create_app).
+            trace_cls = go.Scattergl
+            mode = "lines"
+            result_hover = dict(hovertemplate="Index: %{x}<br>Value: %{y}<extra></extra>")
+            oos_hover = dict(hovertemplate="Index: %{x}<br>OOS: %{y}<extra></extra>")
+        else:
+            trace_cls = go.Scatter
+            mode = "lines+markers"
+            result_hover = dict(
+                customdata=s["part_id"],
+                hovertemplate="Part: %{customdata}<br>Value: %{y}<extra></extra>"
+            )
+            oos_hover = dict(
+                customdata=s["part_id"][oos_index],
+                hovertemplate="Part: %{customdata}<br>OOS: %{y}<extra></extra>"
+            )
+
+        fig.add_trace(
+            trace_cls(
+                # x0/dx instead of an index array: x is implied by position
+                x0=0,
+                dx=1,
+                y=s["result"],
+                mode=mode,
+                name=f"{param} Result",
+                **result_hover
+            ),
+            row=i, col=1
+        )
+
+        fig.add_trace(
+            trace_cls(
+                x=oos_index,
+                y=s["result"][oos_index],
+                mode="markers",
+                marker=dict(color="red", size=8),
+                name="Out of Spec",
+                showlegend=(i == 1),
+                **oos_hover
+            ),
+            row=i, col=1
+        )
+
+        low, high = s["low"], s["high"]
+        fig.add_hline(y=high, line_dash="dash", line_color="red", row=i, col=1)
+        fig.add_hline(y=low, line_dash="dash", line_color="green", row=i, col=1)
+
+        fig.add_hrect(
+            y0=low,
+            y1=high,
+            fillcolor="green",
+            opacity=0.1,
+            line_width=0,
+            row=i, col=1
+        )
+
+    fig.update_layout(
+        height=300 * len(selected_params),
+        hovermode="x unified",
+        showlegend=True
+    )
+
+    return fig
+
+
+def lookup_part(series, selected_params, hover_data):
+    """Resolve a hovered point back to its part id."""
+    if not hover_data or not selected_params:
+        return ""
+
+    point = hover_data["points"][0]
+    # Two traces (result, out of spec) per parameter, in selection order
+    trace = point["curveNumber"] // 2
+    if trace >= len(selected_params):
+        return ""
+    param = selected_params[trace]
+    s = series[param]
+    index = int(point["x"])
+    # The data may have been refreshed since the figure was drawn
+    if index >= len(s["result"]):
+        return ""
+    return f"{param} | Part: {s['part_id'][index]} | Value: {s['result'][index]:g}"
+
+
+def summary_tiles(cube):
+    """Pass rate / FPY / OOS tiles per parameter, answered from the yield cube."""
+    if cube is None:
+        return []
+
+    tile_style = {
+        "display": "inline-block",
+        "padding": "6px 12px",
+        "marginRight": "8px",
+        "border": "1px solid #ddd",
+        "borderRadius": "4px",
+    }
+    tiles = []
+    for param, row in cube.summary(("parameter",)).iterrows():
+        tiles.append(html.Div(
+            style=tile_style,
+            children=[
+                html.B(param),
+                html.Div(f"Pass {row['pass_rate']:.1%} | FPY {row['first_pass_yield']:.1%}"),
+                html.Div(f"OOS {int(row['oos'])} of {int(row['count'])}"),
+            ]
+        ))
+    return tiles
+
+
+# ------------------------
+# App
+# ------------------------
+def create_app(merged, parameters, gl_threshold=GL_THRESHOLD, cube=None):
+    data = DashboardData(build_series(merged), list(parameters), cube)
+    return make_app(lambda: data, gl_threshold)
+
+
+def make_app(get_data, gl_threshold=GL_THRESHOLD):
+    """Build the Dash app around a DashboardData provider instead of fixed frames.
+
+    The provider is called once per page load / callback, so a server can
+    swap the data underneath the app (see serve.py) without rebuilding it.
+    """
+    app = Dash(__name__)
+
+    def layout():
+        data = get_data()
+        parameters = data.parameters
+        return html.Div(
+            style={"padding": "10px"},
+            children=[
+                html.H2("Process Monitoring Interactive Dashboard"),
+
+                dcc.Dropdown(
+                    id="param-select",
+                    options=[{"label": p, "value": p} for p in parameters],
+                    value=list(parameters),
+                    multi=True
+                ),
+
+                html.Div(id="summary-tiles", children=summary_tiles(data.cube), style={"margin": "8px 0"}),
+
+                html.Div(id="hover-part", style={"fontFamily": "monospace", "minHeight": "1.5em"}),
+
+                dcc.Graph(id="process-graph", style={"height": "85vh"})
+            ]
+        )
+
+    app.layout = layout
+
+    @app.callback(
+        Output("process-graph", "figure"),
+        Input("param-select", "value")
+    )
+    def update_graph(selected_params):
+        series = get_data().series
+        selected_params = [p for p in selected_params or [] if p in series]
+        return build_figure(series, selected_params, gl_threshold)
+
+    @app.callback(
+        Output("hover-part", "children"),
+        Input("process-graph", "hoverData"),
+        State("param-select", "value")
+    )
+    def update_hover(hover_data, selected_params):
+        series = get_data().series
+        selected_params = [p for p in selected_params or [] if p in series]
+        return lookup_part(series, selected_params, hover_data)
+
+    return app
+
+
+if __name__ == "__main__":
+    from yield_cube import load_cube
+
+    merged, parameters = load_merged()
+    app = create_app(merged, parameters, cube=load_cube())
+    app.run(debug=True)
@@ -0,0 +1,323 @@
+import codecs
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# ------------------------
+# File type detection
+# ------------------------
+# .xlsx is a zip container, legacy .xls is an OLE2 compound document.
+# Anything else is treated as delimited text, whatever the extension says.
+XLSX_MAGIC = b"PK\x03\x04"
+XLS_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+CHUNK_ROWS = 50_000
+SNIFF_BYTES = 64 * 1024
+CACHE_SUFFIX = ".cache"
+
+
+def sniff_format(file_name):
+    """Return "xlsx", "xls" or "csv" based on the file's first bytes."""
+    with open(file_name, "rb") as f:
+        head = f.read(8)
+    if head.startswith(XLSX_MAGIC):
+        return "xlsx"
+    if head.startswith(XLS_MAGIC):
+        return "xls"
+    return "csv"
+
+
+# ------------------------
+# Streaming xlsx reader
+# ------------------------
+def iter_xlsx_rows(file_name, sheet_name=None):
+    """Yield the header, then every non-empty row, from an xlsx sheet.
+
+    The workbook is opened in openpyxl's read-only mode, which parses the
+    sheet XML as a stream instead of building the full cell model. Only the
+    reader itself is constant-memory; callers that keep the rows still pay
+    for them.
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(file_name, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.active
+        rows = ws.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        yield [
+            str(h).strip() if h is not None else f"Unnamed: {i}"
+            for i, h in enumerate(header)
+        ]
+
+        for row in rows:
+            if any(v is not None for v in row):
+                yield row
+    finally:
+        wb.close()
+
+
+def read_xlsx(file_name, sheet_name=None, chunk_rows=CHUNK_ROWS):
+    """Read an xlsx sheet into a DataFrame, converting it chunk by chunk.
+
+    Rows are turned into a DataFrame every `chunk_rows` rows so that no more
+    than one chunk of Python row tuples is alive at a time. The chunks are
+    then concatenated, so peak memory is roughly twice the final frame; this
+    is a one-time cost, since later loads come from the columnar cache.
+    """
+    rows = iter_xlsx_rows(file_name, sheet_name)
+    columns = next(rows, None)
+    if columns is None:
+        return pd.DataFrame()
+
+    chunks = []
+    buffer = []
+    for row in rows:
+        buffer.append(row[:len(columns)])
+        if len(buffer) >= chunk_rows:
+            chunks.append(pd.DataFrame(buffer, columns=columns))
+            buffer = []
+    if buffer or not chunks:
+        chunks.append(pd.DataFrame(buffer, columns=columns))
+
+    return pd.concat(chunks, ignore_index=True).infer_objects()
+
+
+def read_source(file_name):
+    """Parse `file_name` once, with the reader matching its real content."""
+    kind = sniff_format(file_name)
+    if kind == "xlsx":
+        return read_xlsx(file_name)
+    if kind == "xls":
+        return pd.read_excel(file_name)
+    return pd.read_csv(file_name, encoding=csv_encoding(file_name),
+                       encoding_errors="replace", on_bad_lines="skip")
+
+
+def csv_encoding(file_name):
+    """Pick the codec for a CSV from its first bytes, so it is parsed once.
+
+    The QA exports carry a UTF-8 BOM. Without one, a sample that decodes as
+    UTF-8 is taken as UTF-8; anything else is ISO-8859-1, which is what the
+    older scripts (code2, code4) always read these files as.
+    """
+    with open(file_name, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # final=False: a multi-byte character cut off by the sample is fine
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return "ISO-8859-1"
+    return "utf-8"
+
+
+# ------------------------
+# Columnar cache
+# ------------------------
+# <file>.cache/ holds the .npy arrays for each column plus meta.json, which
+# tags every column with its kind and original dtype so read_cache returns
+# the same frame the parser did. Loading never needs pickle and the arrays
+# can be memory-mapped.
+#
+#   numpy       plain numpy dtype (int, float, bool, naive datetime)
+#   datetime_tz tz-aware datetimes, stored as naive UTC
+#   masked      nullable Int/Float/boolean: values + NA mask
+#   text        str / all-string object: int32 codes into unique labels,
+#               code -1 is missing (keeps "" apart from NaN)
+#   object_bool object column of bools and missing values: values + mask
+#
+# A frame with any other column (e.g. an object column mixing numbers and
+# text) is not cached at all; it is parsed from the source every time.
+MASKED_DTYPES = ("Int8", "Int16", "Int32", "Int64", "UInt8", "UInt16", "UInt32", "UInt64",
+                 "Float32", "Float64", "boolean")
+
+
+def cache_dir_for(file_name):
+    return file_name + CACHE_SUFFIX
+
+
+def source_stamp(file_name):
+    st = os.stat(file_name)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _missing_value(series):
+    # Object columns from openpyxl hold None, from read_csv NaN; keep whichever
+    missing = series[series.isna()]
+    return "none" if any(v is None for v in missing) else "nan"
+
+
+def encode_column(series):
+    """Return (kind, arrays, extra meta) for `series`, or None if it can't round-trip."""
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        return "numpy", {"values": series.to_numpy()}, {}
+
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        values = series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+        return "datetime_tz", {"values": values}, {"tz": str(dtype.tz)}
+
+    if str(dtype) in MASKED_DTYPES:
+        mask = series.isna().to_numpy()
+        values = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+        return "masked", {"values": values, "mask": mask}, {}
+
+    present = series.dropna()
+    if isinstance(dtype, pd.StringDtype) or (
+        dtype == object and all(isinstance(v, str) for v in present)
+    ):
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        labels = np.asarray(uniques, dtype=object).astype(str)
+        extra = {"na": _missing_value(series)} if dtype == object else {}
+        return "text", {"codes": codes.astype(np.int32), "labels": labels}, extra
+
+    if dtype == object and all(isinstance(v, (bool, np.bool_)) for v in present):
+        mask = series.isna().to_numpy()
+        values = series.where(~mask, False).to_numpy().astype(bool)
+        return "object_bool", {"values": values, "mask": mask}, {"na": _missing_value(series)}
+
+    return None
+
+
+def decode_column(col, arrays):
+    kind = col["kind"]
+    na = None if col.get("na") == "none" else np.nan
+
+    if kind == "numpy":
+        return pd.Series(arrays["values"])
+
+    if kind == "datetime_tz":
+        return pd.Series(arrays["values"]).dt.tz_localize("UTC").dt.tz_convert(col["tz"])
+
+    if kind == "masked":
+        series = pd.Series(np.asarray(arrays["values"])).astype(col["dtype"])
+        return series.mask(np.asarray(arrays["mask"]))
+
+    if kind == "text":
+        codes = np.asarray(arrays["codes"])
+        present = codes >= 0
+        values = np.full(len(codes), na, dtype=object)
+        values[present] = np.asarray(arrays["labels"]).astype(object)[codes[present]]
+        return pd.Series(values, dtype=object).astype(col["dtype"])
+
+    if kind == "object_bool":
+        values = np.asarray(arrays["values"]).astype(object)
+        values[np.asarray(arrays["mask"])] = na
+        return pd.Series(values, dtype=object)
+
+    raise ValueError(f"unknown cache column kind {kind!r}")
+
+
+def write_cache(df, cache_dir, stamp):
+    """Write `df` as a columnar cache. Returns False if it can't round-trip."""
+    meta_file = os.path.join(cache_dir, "meta.json")
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+
+    if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+        return False
+    if not all(isinstance(c, str) for c in df.columns) or df.columns.has_duplicates:
+        return False
+
+    encoded = []
+    for col in df.columns:
+        enc = encode_column(df[col])
+        if enc is None:
+            return False
+        encoded.append(enc)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    columns = []
+    for i, (col, (kind, arrays, extra)) in enumerate(zip(df.columns, encoded)):
+        files = {}
+        for part, values in arrays.items():
+            files[part] = f"{i}.{part}.npy"
+            # Written under a unique name and moved into place, so concurrent
+            # loaders of the same source never see a half-written array
+            tmp = os.path.join(cache_dir, f"{files[part]}.{os.getpid()}.tmp.npy")
+            np.save(tmp, values, allow_pickle=False)
+            os.replace(tmp, os.path.join(cache_dir, files[part]))
+        columns.append(dict(extra, name=col, kind=kind, dtype=str(df[col].dtype), files=files))
+
+    # meta.json is written last, so a half-written cache is never picked up
+    tmp = os.path.join(cache_dir, f"meta.json.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump({"source": stamp, "rows": len(df), "columns": columns}, f)
+    os.replace(tmp, meta_file)
+    return True
+
+
+def read_cache(cache_dir, mmap_mode=None):
+    with open(os.path.join(cache_dir, "meta.json")) as f:
+        meta = json.load(f)
+
+    data = {}
+    for col in meta["columns"]:
+        arrays = {
+            part: np.load(os.path.join(cache_dir, file), mmap_mode=mmap_mode, allow_pickle=False)
+            for part, file in col["files"].items()
+        }
+        data[col["name"]] = decode_column(col, arrays)
+    return pd.DataFrame(data, index=pd.RangeIndex(meta["rows"]))
+
+
+def cache_is_fresh(file_name, cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return meta.get("source") == source_stamp(file_name)
+
+
+def load_table(file_name, use_cache=True):
+    """Load results/limits data, converting the source to the cache once.
+
+    The first call parses the file (streaming xlsx when it really is one) and
+    writes the columnar cache next to it; later calls read the cache until
+    the source file changes. Frames the cache can't reproduce exactly are
+    returned as parsed and not cached.
+    """
+    if not use_cache:
+        return read_source(file_name)
+
+    cache_dir = cache_dir_for(file_name)
+    if cache_is_fresh(file_name, cache_dir):
+        return read_cache(cache_dir)
+
+    # Stamped before parsing: if the file grows meanwhile, the cache is
+    # older than its stamp says and the next call parses it again
+    stamp = source_stamp(file_name)
+    df = read_source(file_name)
+    write_cache(df, cache_dir, stamp)
+    return df
+
+
+def load_limits(limits_file="limits.csv"):
+    """Return {param_name: (lower, upper)} from limits.csv or limits.xlsx."""
+    limits_df = load_table(limits_file)
+    limits_df.columns = limits_df.columns.str.strip()
+    name_col = "param_name" if "param_name" in limits_df.columns else "Parameter"
+    limits_df = limits_df.dropna(subset=[name_col, "Lower OK", "Upper OK"])
+    return {
+        row[name_col]: (float(row["Lower OK"]), float(row["Upper OK"]))
+        for _, row in limits_df.iterrows()
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    for name in sys.argv[1:] or ["results.xlsx", "limits.xlsx"]:
+        start = time.perf_counter()
+        df = load_table(name)
+        print(f"{name}: {sniff_format(name)}, {len(df)} rows, "
+              f"{time.perf_counter() - start:.3f}s")
@@ -0,0 +1,249 @@
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from types import MappingProxyType
+
+import numpy as np
+
+# ------------------------
+# Production serve mode
+#   python serve.py publish [--watch]     (refresher: build/swap the store)
+#   gunicorn -w 8 "serve:wsgi()"          (workers: attach to the store)
+#   python serve.py                       (single process: publish once, then serve)
+# ------------------------
+# The refresher merges results with limits once and writes the typed arrays
+# into store/v<N>/ as .npy files. Workers memory-map the current version
+# read-only, so every worker shares the same page-cache pages and adding
+# workers does not add copies of the data. A new version is published by
+# atomically replacing store/CURRENT; workers pick it up on their next
+# request.
+
+import stdlib_guard  # noqa: F401  (must come before dash)
+
+from dashboard_fast import DashboardData, load_file, make_app, merge_limits
+from ingest import source_stamp
+from yield_cube import MappedCube, load_cube, read_rows
+
+STORE_DIR = "store"
+KEEP_VERSIONS = 3
+POLL_SECONDS = 5
+# Unfinished .v*.tmp dirs older than this are left over from a crashed publish
+STALE_TMP_SECONDS = 3600
+# How long a worker waits for the refresher to publish the first version
+ATTACH_TIMEOUT = 60
+
+ARRAYS = ("result", "part_id", "offsets", "oos_index", "oos_offsets", "low", "high")
+
+
+# ------------------------
+# Refresher side
+# ------------------------
+def publish(results_file="results.csv", limits_file="limits.csv", store_dir=STORE_DIR):
+    """Write a new store version and make it current. Returns its name."""
+    # One stamp bounds every read of the results file, so the series, the
+    # cube and meta.json all describe the same rows even while it grows
+    stamp = source_stamp(results_file)
+    merged, parameters = merge_limits(read_rows(results_file, stamp), load_file(limits_file))
+    parameters = [str(p) for p in parameters]
+
+    # Rows sorted by parameter so each parameter is one contiguous slice
+    codes = {p: i for i, p in enumerate(parameters)}
+    merged = merged[merged["param_name"].isin(codes)]
+    merged = merged.assign(code=merged["param_name"].map(codes)).sort_values("code", kind="stable")
+
+    counts = np.bincount(merged["code"].to_numpy(), minlength=len(parameters))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    part_id = merged["uniquepart_id"].to_numpy()
+    if part_id.dtype == object:
+        part_id = part_id.astype(str)
+
+    # OOS positions are stored per parameter (local to its slice), so workers
+    # never have to scan the flags themselves
+    oos = merged["out_of_spec"].to_numpy(bool)
+    oos_index = []
+    for a, b in zip(offsets[:-1], offsets[1:]):
+        oos_index.append(np.flatnonzero(oos[a:b]).astype(np.uint32))
+    oos_offsets = np.concatenate([[0], np.cumsum([len(o) for o in oos_index])]).astype(np.int64)
+
+    limits = merged.groupby("code")[["Lower OK", "Upper OK"]].first().reindex(range(len(parameters)))
+    arrays = {
+        "result": merged["result"].to_numpy(np.float32),
+        "part_id": part_id,
+        "offsets": offsets,
+        "oos_index": np.concatenate(oos_index) if oos_index else np.zeros(0, np.uint32),
+        "oos_offsets": oos_offsets,
+        "low": limits["Lower OK"].to_numpy(np.float64),
+        "high": limits["Upper OK"].to_numpy(np.float64),
+    }
+
+    os.makedirs(store_dir, exist_ok=True)
+    version = f"v{time.time_ns()}"
+    tmp_dir = os.path.join(store_dir, f".{version}.tmp")
+    os.makedirs(tmp_dir)
+    for name, values in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), values, allow_pickle=False)
+
+    load_cube(results_file, limits_file, stamp).save_columns(os.path.join(tmp_dir, "cube"))
+
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump({"parameters": parameters, "source": stamp}, f)
+
+    # Only a complete directory is ever renamed into place, and only then
+    # does CURRENT point at it
+    os.rename(tmp_dir, os.path.join(store_dir, version))
+    current_tmp = os.path.join(store_dir, f"CURRENT.{os.getpid()}.{version}.tmp")
+    with open(current_tmp, "w") as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(store_dir, "CURRENT"))
+
+    prune(store_dir)
+    return version
+
+
+def read_current(store_dir=STORE_DIR):
+    try:
+        with open(os.path.join(store_dir, "CURRENT")) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def prune(store_dir=STORE_DIR, keep=KEEP_VERSIONS):
+    # Workers still mapping a removed version keep its pages until they
+    # re-attach; unlinking the files does not invalidate their mappings.
+    # The version CURRENT names is never removed, whatever its age.
+    current = read_current(store_dir)
+    versions = sorted(
+        (d for d in os.listdir(store_dir) if d.startswith("v")),
+        key=lambda d: int(d[1:])
+    )
+    for old in versions[:-keep]:
+        if old != current:
+            shutil.rmtree(os.path.join(store_dir, old), ignore_errors=True)
+
+    now = time.time()
+    for d in os.listdir(store_dir):
+        path = os.path.join(store_dir, d)
+        if d.startswith(".v") and d.endswith(".tmp") and now - os.path.getmtime(path) > STALE_TMP_SECONDS:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def watch(results_file="results.csv", limits_file="limits.csv", store_dir=STORE_DIR, poll=POLL_SECONDS):
+    """Republish whenever the results or limits file changes."""
+    last = None
+    while True:
+        stamp = (source_stamp(results_file), source_stamp(limits_file))
+        if stamp != last:
+            version = publish(results_file, limits_file, store_dir)
+            print(f"published {version}")
+            last = stamp
+        time.sleep(poll)
+
+
+# ------------------------
+# Worker side
+# ------------------------
+class SharedStore:
+    """Read-only, memory-mapped view of the current store version.
+
+    get() returns one immutable DashboardData snapshot (series, parameters,
+    cube) of a single version. A new version is attached under a lock and
+    swapped in with one assignment, so threads never see a mix of versions.
+    Checking for a new version costs one stat of CURRENT per call.
+    """
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self.current_file = os.path.join(store_dir, "CURRENT")
+        self.lock = threading.Lock()
+        # (CURRENT mtime, version, DashboardData), replaced as a whole
+        self.state = (None, None, None)
+
+    def get(self):
+        mtime = os.stat(self.current_file).st_mtime_ns
+        state = self.state
+        if mtime != state[0]:
+            with self.lock:
+                state = self.state
+                if mtime != state[0]:
+                    state = self._refresh(mtime, state)
+                    self.state = state
+        return state[2]
+
+    def _refresh(self, mtime, state):
+        version = read_current(self.store_dir)
+        if version == state[1]:
+            return (mtime, version, state[2])
+        return (mtime, version, self._attach(version))
+
+    def _attach(self, version):
+        path = os.path.join(self.store_dir, version)
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        a = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+            for name in ARRAYS
+        }
+
+        # Slices of a memmap are views on the same mapping; nothing is copied
+        series = {}
+        offsets, oos_offsets = a["offsets"], a["oos_offsets"]
+        for i, param in enumerate(meta["parameters"]):
+            lo, hi = offsets[i], offsets[i + 1]
+            series[param] = {
+                "result": a["result"][lo:hi],
+                "oos_index": a["oos_index"][oos_offsets[i]:oos_offsets[i + 1]],
+                "part_id": a["part_id"][lo:hi],
+                "low": float(a["low"][i]),
+                "high": float(a["high"][i]),
+            }
+
+        return DashboardData(
+            MappingProxyType(series),
+            tuple(meta["parameters"]),
+            MappedCube(os.path.join(path, "cube")),
+        )
+
+
+def wait_for_store(store_dir=STORE_DIR, timeout=ATTACH_TIMEOUT):
+    """Block until the refresher has published a version.
+
+    Workers never publish themselves: that would load and merge a copy of
+    the data per worker and race on the store.
+    """
+    deadline = time.monotonic() + timeout
+    while read_current(store_dir) is None:
+        if time.monotonic() > deadline:
+            raise RuntimeError(
+                f"no data published in {store_dir!r}; "
+                f"run 'python serve.py publish' (or 'publish --watch') first"
+            )
+        time.sleep(0.5)
+
+
+def create_server(store_dir=STORE_DIR, timeout=ATTACH_TIMEOUT):
+    wait_for_store(store_dir, timeout)
+    store = SharedStore(store_dir)
+    return make_app(store.get)
+
+
+def wsgi(store_dir=STORE_DIR):
+    """WSGI factory for multi-worker servers; each worker maps the store itself."""
+    return create_server(store_dir).server
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "publish":
+        if "--watch" in args:
+            watch()
+        else:
+            print(publish())
+    else:
+        # Single process: act as its own refresher once, then serve
+        publish()
+        create_server().run(debug=False)
@@ -0,0 +1,25 @@
+import os
+import sys
+
+# This folder has a code.py script that shadows the stdlib `code` module.
+# werkzeug's debugger does `import code` when Dash builds its server, and
+# that would run code.py (or crash on its imports) instead. Importing this
+# module before `dash` loads the real `code` module while this directory is
+# kept off the search path.
+
+_here = os.path.dirname(os.path.abspath(__file__))
+
+
+def _is_local(module):
+    path = getattr(module, "__file__", None)
+    return path is not None and os.path.dirname(os.path.abspath(path)) == _here
+
+
+if "code" not in sys.modules or _is_local(sys.modules["code"]):
+    sys.modules.pop("code", None)
+    _path = sys.path[:]
+    sys.path[:] = [p for p in sys.path if os.path.abspath(p or ".") != _here]
+    try:
+        import code  # noqa: F401
+    finally:
+        sys.path[:] = _path
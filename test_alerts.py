@@ -0,0 +1,130 @@
+import os
+
+import alerts
+
+PARAMS = ["A", "B", "C"]
+
+
+def rows_for(part, params):
+    return [{"uniquepart_id": part, "param_name": p, "result": 1.0} for p in params]
+
+
+def run(rule, rows):
+    events = []
+    for row in rows:
+        events.extend(rule.check(row))
+    return events + rule.flush()
+
+
+def test_missing_parameter_reports_incomplete_part():
+    rule = alerts.MissingParameter(PARAMS)
+    events = run(rule, rows_for(1, ["A", "B"]) + rows_for(2, PARAMS))
+    assert [(e["part"], e["param"]) for e in events] == [(1, "C")]
+
+
+def test_missing_parameter_ignores_retest_of_closed_part():
+    rule = alerts.MissingParameter(PARAMS, window_rows=3)
+    rows = rows_for(1, PARAMS)
+    for part in range(2, 8):
+        rows += rows_for(part, PARAMS)
+    # part 1 was closed long ago; its re-test must not reopen it empty
+    rows += rows_for(1, ["B"])
+    assert run(rule, rows) == []
+
+
+def test_missing_parameter_keeps_split_run_open_within_window():
+    rule = alerts.MissingParameter(PARAMS, window_rows=6)
+    rows = rows_for(1, ["A"]) + rows_for(2, PARAMS) + rows_for(1, ["B", "C"])
+    assert run(rule, rows) == []
+
+
+HEADER = "uniquepart_id,result_timestamp,result_state,param_name,result,unit\n"
+
+
+def append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_follow_csv_skips_history_and_bad_rows(tmp_path):
+    path = str(tmp_path / "results.csv")
+    append(path, HEADER + "1,11/4/2026,1,A,23,HZ\n")
+
+    rows = alerts.follow_csv(path)
+    append(path, "2,11/4/2026,1\n")                              # short line
+    append(path, "3,11/4/2026,1,B,N/A,V\n")                      # non-numeric result
+    append(path, '4,11/4/2026,1,"Plasma, Voltage",280,V\n')     # quoted comma
+    row = next(rows)
+
+    assert row["uniquepart_id"] == "4"
+    assert row["param_name"] == "Plasma, Voltage"
+    assert row["result"] == 280.0
+
+
+def test_follow_csv_resumes_from_saved_offset(tmp_path):
+    path = str(tmp_path / "results.csv")
+    offset_file = str(tmp_path / "results.csv.offset")
+    append(path, HEADER)
+
+    rows = alerts.follow_csv(path, offset_file=offset_file, save_every=1)
+    append(path, "1,11/4/2026,1,A,23,HZ\n2,11/4/2026,1,A,24,HZ\n")
+    assert next(rows)["uniquepart_id"] == "1"
+    assert next(rows)["uniquepart_id"] == "2"
+    rows.close()
+
+    append(path, "3,11/4/2026,1,A,25,HZ\n")
+    assert next(alerts.follow_csv(path, offset_file=offset_file))["uniquepart_id"] == "3"
+
+
+def test_iter_rows_drops_non_numeric_results(tmp_path):
+    path = str(tmp_path / "results.csv")
+    append(path, HEADER + "1,11/4/2026,1,A,23,HZ\n2,11/4/2026,1,A,N/A,HZ\n")
+    assert [r["uniquepart_id"] for r in alerts.iter_rows(path)] == [1]
+
+
+def test_non_finite_results_are_dropped_on_both_paths(tmp_path):
+    path = str(tmp_path / "results.csv")
+    append(path, HEADER + "1,11/4/2026,1,A,nan,HZ\n2,11/4/2026,1,A,inf,HZ\n3,11/4/2026,1,A,12,HZ\n")
+    assert [r["uniquepart_id"] for r in alerts.iter_rows(path)] == [3]
+
+    columns = HEADER.strip().split(",")
+    assert alerts.parse_row(columns, "1,11/4/2026,1,A,nan,HZ") is None
+    assert alerts.parse_row(columns, "2,11/4/2026,1,A,-inf,HZ") is None
+    assert alerts.parse_row(columns, "3,11/4/2026,1,A,12,HZ")["result"] == 12.0
+
+
+def test_follow_csv_waits_for_header_of_empty_file(tmp_path):
+    path = str(tmp_path / "results.csv")
+    append(path, "")
+
+    rows = alerts.follow_csv(path)
+    append(path, HEADER[:20])
+    append(path, HEADER[20:] + "1,11/4/2026,1,A,23,HZ\n")
+    assert next(rows)["param_name"] == "A"
+
+
+def test_follow_csv_reopens_truncated_file(tmp_path):
+    path = str(tmp_path / "results.csv")
+    append(path, HEADER + "1,11/4/2026,1,A,23,HZ\n" * 5)
+
+    rows = alerts.follow_csv(path)
+    append(path, "2,11/4/2026,1,A,24,HZ\n")
+    assert next(rows)["uniquepart_id"] == "2"
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER + "3,12/1/2026,1,A,25,HZ\n")
+    assert next(rows)["uniquepart_id"] == "3"
+
+
+def test_follow_csv_reopens_replaced_file(tmp_path):
+    path = str(tmp_path / "results.csv")
+    append(path, HEADER)
+
+    rows = alerts.follow_csv(path)
+    append(path, "1,11/4/2026,1,A,23,HZ\n")
+    assert next(rows)["uniquepart_id"] == "1"
+
+    new = str(tmp_path / "export.csv")
+    append(new, "uniquepart_id,param_name,result\n" + "4,B,7\n" * 3)
+    os.replace(new, path)
+    assert [next(rows)["param_name"] for _ in range(3)] == ["B"] * 3
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+import dashboard_fast
+
+
+def make_merged():
+    return pd.DataFrame({
+        "uniquepart_id": [101, 102, 103, 201, 202],
+        "param_name": ["A", "A", "A", "B", "B"],
+        "result": [1.0, 9.0, 2.0, 5.0, 6.0],
+        "Lower OK": [0.0, 0.0, 0.0, 4.0, 4.0],
+        "Upper OK": [5.0, 5.0, 5.0, 5.5, 5.5],
+        "out_of_spec": [False, True, False, False, True],
+    })
+
+
+def test_build_figure_switches_to_webgl_above_threshold():
+    series = dashboard_fast.build_series(make_merged())
+
+    small = dashboard_fast.build_figure(series, ["A", "B"], gl_threshold=3)
+    assert [t.type for t in small.data] == ["scatter"] * 4
+    assert list(small.data[0].customdata) == [101, 102, 103]
+    assert list(small.data[1].customdata) == [102]
+
+    # A has 3 points, B has 2: only traces over the threshold switch
+    mixed = dashboard_fast.build_figure(series, ["A", "B"], gl_threshold=2)
+    assert [t.type for t in mixed.data] == ["scattergl", "scattergl", "scatter", "scatter"]
+    assert mixed.data[0].customdata is None
+    assert mixed.data[1].customdata is None
+
+
+def hover(curve, x):
+    return {"points": [{"curveNumber": curve, "x": x}]}
+
+
+def test_lookup_part_maps_curve_and_oos_index():
+    series = dashboard_fast.build_series(make_merged())
+    params = ["A", "B"]
+
+    assert dashboard_fast.lookup_part(series, params, hover(0, 2)) == "A | Part: 103 | Value: 2"
+    # OOS trace of B: x is the position in B's own series
+    assert dashboard_fast.lookup_part(series, params, hover(3, 1)) == "B | Part: 202 | Value: 6"
+    assert dashboard_fast.lookup_part(series, ["B"], hover(0, 0)) == "B | Part: 201 | Value: 5"
+
+
+def test_lookup_part_ignores_stale_points():
+    series = dashboard_fast.build_series(make_merged())
+    assert dashboard_fast.lookup_part(series, ["A"], hover(2, 0)) == ""
+    assert dashboard_fast.lookup_part(series, ["A"], hover(0, 3)) == ""
+    assert dashboard_fast.lookup_part(series, ["A"], None) == ""
+    assert np.array_equal(series["A"]["oos_index"], [1])
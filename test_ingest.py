@@ -0,0 +1,58 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ingest
+
+
+@pytest.mark.parametrize("name", ["results.xlsx", "limits.xlsx", "results.csv", "limits.csv"])
+def test_load_table_same_frame_from_cache(tmp_path, name):
+    path = str(tmp_path / name)
+    shutil.copy(name, path)
+
+    first = ingest.load_table(path)
+    assert ingest.cache_is_fresh(path, ingest.cache_dir_for(path))
+    second = ingest.load_table(path)
+
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_cache_round_trips_tagged_dtypes(tmp_path):
+    df = pd.DataFrame({
+        "text": pd.Series(["a", "", None], dtype="str"),
+        "obj_text": pd.Series(["a", "", None], dtype=object),
+        "ints": pd.Series([1, None, 3], dtype="Int64"),
+        "flags": pd.Series([True, None, False], dtype=object),
+        "floats": [1.5, np.nan, 3.0],
+        "when": pd.to_datetime(["2026-11-04 06:00", None, "2026-11-05 00:00"]).tz_localize("Europe/Berlin"),
+    })
+    cache_dir = str(tmp_path / "frame.cache")
+
+    assert ingest.write_cache(df, cache_dir, {"size": 0, "mtime_ns": 0})
+    pd.testing.assert_frame_equal(ingest.read_cache(cache_dir), df)
+
+
+def test_mixed_object_column_is_not_cached(tmp_path):
+    path = str(tmp_path / "mixed.csv")
+    pd.DataFrame({"result": [23, "N/A", 5]}).to_csv(path, index=False)
+    df = pd.DataFrame({"result": pd.Series([23, "N/A", 5], dtype=object)})
+
+    assert not ingest.write_cache(df, ingest.cache_dir_for(path), {"size": 0, "mtime_ns": 0})
+    pd.testing.assert_frame_equal(ingest.load_table(path), ingest.load_table(path))
+
+
+@pytest.mark.parametrize("raw, encoding", [
+    ("\ufeffparam_name,unit\nPlasma Current,µA\n".encode("utf-8"), "utf-8-sig"),
+    ("param_name,unit\nPlasma Current,µA\n".encode("utf-8"), "utf-8"),
+    ("param_name,unit\nPlasma Current,µA\n".encode("ISO-8859-1"), "ISO-8859-1"),
+])
+def test_read_source_sniffs_csv_encoding(tmp_path, raw, encoding):
+    path = tmp_path / "limits.csv"
+    path.write_bytes(raw)
+
+    assert ingest.csv_encoding(str(path)) == encoding
+    df = ingest.read_source(str(path))
+    assert list(df.columns) == ["param_name", "unit"]
+    assert df["unit"].iloc[0] == "µA"
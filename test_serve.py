@@ -0,0 +1,73 @@
+import os
+import shutil
+
+import pytest
+
+import serve
+
+
+@pytest.fixture
+def sources(tmp_path):
+    for name in ("results.csv", "limits.csv"):
+        shutil.copy(name, tmp_path / name)
+    return str(tmp_path / "results.csv"), str(tmp_path / "limits.csv"), str(tmp_path / "store")
+
+
+def test_publish_swaps_snapshot(sources):
+    results, limits, store_dir = sources
+    first = serve.publish(results, limits, store_dir)
+    store = serve.SharedStore(store_dir)
+    data = store.get()
+    assert serve.read_current(store_dir) == first
+    counts = {p: len(s["result"]) for p, s in data.series.items()}
+    assert data.cube.summary(("parameter",))["count"].to_dict() == counts
+
+    with open(results, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(results, "ab") as f:
+        f.write(b"\n" + b"".join(lines[1:7]))  # one more part, every parameter
+    second = serve.publish(results, limits, store_dir)
+
+    assert second != first
+    new = store.get()
+    assert new is not data
+    assert all(len(new.series[p]["result"]) == counts[p] + 1 for p in counts)
+    assert new.cube.summary(("parameter",))["count"].to_dict() == {p: n + 1 for p, n in counts.items()}
+    # The old snapshot still reads its own version
+    assert all(len(data.series[p]["result"]) == counts[p] for p in counts)
+    assert store.get() is new
+
+
+def test_prune_keeps_current_and_clears_stale_tmp(sources):
+    results, limits, store_dir = sources
+    versions = [serve.publish(results, limits, store_dir) for _ in range(3)]
+
+    # CURRENT may name an older version when publishes finish out of order
+    with open(os.path.join(store_dir, "CURRENT"), "w") as f:
+        f.write(versions[0])
+    stale = os.path.join(store_dir, ".v1.tmp")
+    fresh = os.path.join(store_dir, ".v2.tmp")
+    os.makedirs(stale)
+    os.makedirs(fresh)
+    old = os.path.getmtime(stale) - serve.STALE_TMP_SECONDS - 1
+    os.utime(stale, (old, old))
+
+    serve.prune(store_dir, keep=1)
+
+    left = sorted(os.listdir(store_dir))
+    assert versions[0] in left and versions[2] in left and versions[1] not in left
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
+    # Workers can still attach to the version CURRENT names
+    assert serve.SharedStore(store_dir).get().parameters
+
+
+def test_wait_for_store_times_out_without_refresher(tmp_path):
+    with pytest.raises(RuntimeError, match="serve.py publish"):
+        serve.wait_for_store(str(tmp_path), timeout=0.1)
+
+
+def test_wait_for_store_returns_once_published(sources):
+    results, limits, store_dir = sources
+    serve.publish(results, limits, store_dir)
+    serve.wait_for_store(store_dir, timeout=0)
@@ -0,0 +1,71 @@
+import pandas as pd
+
+import yield_cube
+from ingest import load_limits, load_table
+
+
+def write_csv(path, df):
+    df.to_csv(path, index=False)
+
+
+def test_load_cube_folds_in_appended_rows(tmp_path):
+    results = load_table("results.csv")
+    path = str(tmp_path / "results.csv")
+    write_csv(path, results.iloc[:600])
+    yield_cube.load_cube(path, "limits.csv")
+
+    with open(path, "a", encoding="utf-8") as f:
+        results.iloc[600:].to_csv(f, index=False, header=False)
+    cube = yield_cube.load_cube(path, "limits.csv")
+
+    full = yield_cube.YieldCube(load_limits("limits.csv")).update(results)
+    assert cube.rows == len(results)
+    pd.testing.assert_frame_equal(cube.summary(("parameter",)), full.summary(("parameter",)), check_dtype=False)
+    pd.testing.assert_frame_equal(cube.summary(("day",)), full.summary(("day",)), check_dtype=False)
+
+
+def test_loaded_cube_remembers_first_pass(tmp_path):
+    results = load_table("results.csv")
+    path = str(tmp_path / "cube.npz")
+    yield_cube.YieldCube(load_limits("limits.csv")).update(results).save(path, {"size": 0, "mtime_ns": 0})
+
+    cube = yield_cube.YieldCube.load(path, load_limits("limits.csv"))
+    before = cube.summary(("parameter",))["first_pass_yield"]
+    cube.update(results.iloc[:60])  # re-tests of parts already seen
+
+    after = cube.summary(("parameter",))
+    assert (after["first_pass_yield"] == before).all()
+    assert after["count"].sum() == len(results) + 60
+
+
+def test_rewritten_source_rebuilds_cube(tmp_path):
+    results = load_table("results.csv")
+    path = str(tmp_path / "results.csv")
+    write_csv(path, results)
+    yield_cube.load_cube(path, "limits.csv")
+
+    write_csv(path, results.iloc[:100])
+    cube = yield_cube.load_cube(path, "limits.csv")
+    assert cube.summary(("parameter",))["count"].sum() == 100
+
+
+def test_unterminated_last_line_is_folded_in_once_complete(tmp_path):
+    with open("results.csv", "rb") as f:
+        data = f.read()
+    path = str(tmp_path / "results.csv")
+    # Cut after the first digit of a result, e.g. "...,Plasma Pressure,7"
+    cut = data.index(b"Plasma Pressure,", len(data) // 2) + len("Plasma Pressure,") + 1
+    with open(path, "wb") as f:
+        f.write(data[:cut])
+    yield_cube.load_cube(path, "limits.csv")
+
+    with open(path, "ab") as f:
+        f.write(data[cut:])
+    cube = yield_cube.load_cube(path, "limits.csv")
+
+    full = yield_cube.YieldCube(load_limits("limits.csv")).update(load_table("results.csv"))
+    pd.testing.assert_frame_equal(cube.summary(("parameter",)), full.summary(("parameter",)), check_dtype=False)
+
+
+def test_new_cube_has_no_saved_limits():
+    assert yield_cube.YieldCube({"A": (0.0, 1.0)}).saved_limits is None
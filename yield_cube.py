@@ -0,0 +1,402 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ingest import csv_encoding, load_limits, load_table, sniff_format, source_stamp
+
+# ------------------------
+# Yield cube
+#   python yield_cube.py [results file] [limits file]
+# ------------------------
+# Pre-aggregated counts over (day, shift, parameter, state, station). Every
+# summary question (pass rate per day, FPY per parameter, OOS per shift...)
+# is a sum over a few hundred cells instead of a groupby over every result.
+
+DIMS = ("day", "shift", "parameter", "state", "station")
+# count, passed (result_state == 1), oos (outside limits), first (first result
+# of a part for that parameter), first_pass (first result that passed)
+COUNTS = ("count", "passed", "oos", "first", "first_pass")
+STATS = ("sum", "min", "max")
+
+# Shift start hours; a result belongs to the last shift started before it.
+# Date-only timestamps land at midnight and so count towards the night shift.
+SHIFTS = ((6, "A"), (14, "B"), (22, "C"))
+
+CUBE_SUFFIX = ".cube.npz"
+
+
+def pair_keys(part_ids, params):
+    """64-bit hashes of (part, parameter) pairs, used for first-pass tracking.
+
+    Integral part ids are normalised first, so 5788729984 from a CSV and
+    5788729984.0 from an xlsx export hash the same.
+    """
+    part = pd.Series(part_ids, dtype=object).reset_index(drop=True)
+    num = pd.to_numeric(part, errors="coerce")
+    integral = (num.notna() & (num % 1 == 0)).to_numpy()
+    text = part.astype(str).to_numpy(dtype=object)
+    text[integral] = num[integral].astype("int64").astype(str).to_numpy()
+    pairs = pd.DataFrame({"part": text, "param": np.asarray(params, dtype=object)})
+    return pd.util.hash_pandas_object(pairs, index=False).to_numpy(np.uint64)
+
+
+def shift_of(hours):
+    hours = np.asarray(hours)
+    out = np.full(hours.shape, SHIFTS[-1][1], dtype=object)
+    for (start, name), (end, _) in zip(SHIFTS, SHIFTS[1:]):
+        out[(hours >= start) & (hours < end)] = name
+    return out
+
+
+class YieldCube:
+    def __init__(self, limits=None):
+        self.limits = limits or {}
+        # key (tuple over DIMS) -> [count, passed, oos, first, first_pass, sum, min, max]
+        self.cells = {}
+        # Sorted hashes of every (part, parameter) pair seen so far; 8 bytes
+        # per distinct pair, the minimum first-pass yield needs to remember
+        self.seen = np.zeros(0, dtype=np.uint64)
+        # Where the cube is in its source: stamp, data rows folded in so far
+        # and, for CSV sources, the byte offset just past them
+        self.stamp = None
+        self.rows = 0
+        self.csv_tail = None
+        # Limits the cube was saved with; set by load()
+        self.saved_limits = None
+        self._frame = None
+
+    # ------------------------
+    # Incremental update
+    # ------------------------
+    def update(self, results_df):
+        """Fold a batch of result rows (as loaded from results.*) into the cube."""
+        self.rows += len(results_df)
+        if results_df.empty:
+            return self
+        df = results_df.copy()
+        df.columns = df.columns.str.strip().str.lower()
+        df = df.dropna(subset=["param_name", "result"])
+        if df.empty:
+            return self
+
+        ts = pd.to_datetime(df["result_timestamp"], errors="coerce")
+        result = pd.to_numeric(df["result"], errors="coerce")
+
+        frame = pd.DataFrame({
+            "day": ts.dt.strftime("%Y-%m-%d").fillna(""),
+            "shift": shift_of(ts.dt.hour.fillna(0).to_numpy()),
+            "parameter": df["param_name"].astype(str).to_numpy(),
+            "state": pd.to_numeric(df["result_state"], errors="coerce").fillna(-1).astype(int).to_numpy(),
+            "station": df["station"].astype(str).to_numpy() if "station" in df.columns else "",
+            "result": result.to_numpy(),
+        })
+        frame["passed"] = frame["state"] == 1
+
+        bounds = frame["parameter"].map(self.limits)
+        low = bounds.map(lambda b: b[0] if isinstance(b, tuple) else np.nan)
+        high = bounds.map(lambda b: b[1] if isinstance(b, tuple) else np.nan)
+        frame["oos"] = (frame["result"] < low) | (frame["result"] > high)
+
+        # First pass: the first result seen for a (part, parameter) pair,
+        # whether earlier in this batch or in any batch before it
+        keys = pair_keys(df["uniquepart_id"].to_numpy(), frame["parameter"].to_numpy())
+        first = ~pd.Series(keys).duplicated().to_numpy() & ~np.isin(keys, self.seen)
+        self.seen = np.union1d(self.seen, keys[first])
+        frame["first"] = first
+        frame["first_pass"] = first & frame["passed"].to_numpy()
+        frame["count"] = 1
+
+        agg = frame.groupby(list(DIMS), sort=False).agg(
+            count=("count", "sum"),
+            passed=("passed", "sum"),
+            oos=("oos", "sum"),
+            first=("first", "sum"),
+            first_pass=("first_pass", "sum"),
+            sum=("result", "sum"),
+            min=("result", "min"),
+            max=("result", "max"),
+        )
+
+        for key, values in zip(agg.index, agg.itertuples(index=False)):
+            cell = self.cells.get(key)
+            if cell is None:
+                self.cells[key] = list(values)
+                continue
+            for i in range(len(COUNTS) + 1):
+                cell[i] += values[i]
+            cell[-2] = min(cell[-2], values[-2])
+            cell[-1] = max(cell[-1], values[-1])
+        self._frame = None
+        return self
+
+    # ------------------------
+    # Queries
+    # ------------------------
+    def to_frame(self):
+        if self._frame is None:
+            index = pd.MultiIndex.from_tuples(list(self.cells), names=DIMS)
+            self._frame = pd.DataFrame(list(self.cells.values()), index=index, columns=COUNTS + STATS)
+        return self._frame
+
+    def summary(self, by=("day",), **filters):
+        """Roll the cube up to `by`, e.g. summary(("parameter",), day="2026-11-04").
+
+        Returns pass_rate, first_pass_yield, oos and mean/min/max per group.
+        """
+        return summarize(self.to_frame(), by, filters)
+
+    # ------------------------
+    # Compact storage
+    # ------------------------
+    def save(self, path, stamp=None):
+        """Store the cube as dictionary-encoded dims plus typed measure arrays.
+
+        The first-pass hashes and the position in the source are saved too,
+        so a loaded cube can keep folding in new rows.
+        """
+        if stamp is not None:
+            self.stamp = stamp
+        arrays = self.cell_arrays()
+        arrays["seen"] = self.seen
+        arrays["meta"] = np.array(json.dumps({
+            "source": self.stamp,
+            "rows": self.rows,
+            "csv_tail": self.csv_tail,
+            "limits": {p: list(b) for p, b in self.limits.items()},
+        }))
+
+        # Unique temp name: several processes may save the same cube at once
+        tmp = f"{path}.{os.getpid()}.{time.time_ns()}.tmp.npz"
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, path)
+
+    def cell_arrays(self):
+        keys = list(self.cells)
+        values = np.array(list(self.cells.values()), dtype=np.float64).reshape(-1, len(COUNTS + STATS))
+        arrays = {}
+        for d, dim in enumerate(DIMS):
+            labels, codes = np.unique(np.array([str(k[d]) for k in keys], dtype=str), return_inverse=True)
+            arrays[f"{dim}_labels"] = labels
+            arrays[f"{dim}_codes"] = codes.astype(np.int32)
+        for m, name in enumerate(COUNTS):
+            arrays[name] = values[:, m].astype(np.int64)
+        for m, name in enumerate(STATS, start=len(COUNTS)):
+            arrays[name] = values[:, m]
+        return arrays
+
+    def save_columns(self, cube_dir):
+        """Write the cells as one .npy per array, for MappedCube to map."""
+        os.makedirs(cube_dir, exist_ok=True)
+        for name, values in self.cell_arrays().items():
+            np.save(os.path.join(cube_dir, f"{name}.npy"), values, allow_pickle=False)
+
+    @classmethod
+    def load(cls, path, limits=None):
+        cube = cls(limits)
+        with np.load(path, allow_pickle=False) as z:
+            dims = [z[f"{dim}_labels"][z[f"{dim}_codes"]] for dim in DIMS]
+            dims[DIMS.index("state")] = dims[DIMS.index("state")].astype(int)
+            measures = [z[name] for name in COUNTS + STATS]
+            cube.seen = z["seen"]
+            meta = json.loads(str(z["meta"]))
+        cube.stamp = meta["source"]
+        cube.rows = meta["rows"]
+        cube.csv_tail = meta["csv_tail"]
+        cube.saved_limits = {p: tuple(b) for p, b in meta["limits"].items()}
+        for i, key in enumerate(zip(*dims)):
+            cube.cells[tuple(k.item() for k in key)] = [m[i].item() for m in measures]
+        return cube
+
+
+class MappedCube:
+    """Read-only cube over the memory-mapped arrays written by save_columns.
+
+    Nothing is copied into the process when it is opened; each query builds
+    a throwaway frame whose index uses the stored codes directly, so many
+    processes can share one cube without each holding its own cells.
+    """
+
+    def __init__(self, cube_dir):
+        names = [f"{dim}_{part}" for dim in DIMS for part in ("labels", "codes")] + list(COUNTS + STATS)
+        self.arrays = {
+            name: np.load(os.path.join(cube_dir, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+            for name in names
+        }
+
+    def to_frame(self):
+        a = self.arrays
+        levels = [np.asarray(a[f"{dim}_labels"]) for dim in DIMS]
+        levels[DIMS.index("state")] = levels[DIMS.index("state")].astype(int)
+        index = pd.MultiIndex(
+            levels=levels,
+            codes=[np.asarray(a[f"{dim}_codes"]) for dim in DIMS],
+            names=DIMS,
+            verify_integrity=False,
+        )
+        return pd.DataFrame({name: a[name] for name in COUNTS + STATS}, index=index)
+
+    def summary(self, by=("day",), **filters):
+        return summarize(self.to_frame(), by, filters)
+
+
+def summarize(cube, by, filters):
+    for dim, value in filters.items():
+        cube = cube[cube.index.get_level_values(dim) == value]
+
+    out = cube.groupby(level=list(by)).agg({
+        "count": "sum", "passed": "sum", "oos": "sum",
+        "first": "sum", "first_pass": "sum",
+        "sum": "sum", "min": "min", "max": "max",
+    })
+    out["pass_rate"] = out["passed"] / out["count"]
+    out["first_pass_yield"] = out["first_pass"] / out["first"]
+    out["mean"] = out["sum"] / out["count"]
+    return out[["count", "passed", "pass_rate", "first_pass_yield", "oos", "mean", "min", "max"]]
+
+
+def cube_path_for(results_file):
+    return results_file + CUBE_SUFFIX
+
+
+def csv_tail(results_file, size):
+    """Byte offset just past the last complete line within the first `size`
+    bytes of a CSV, plus a checksum of the bytes before it so a rewritten
+    (not appended) file is noticed. None for other formats.
+
+    A last line without its newline may still be being written; it is left
+    for the next update, which reads from this offset.
+    """
+    if sniff_format(results_file) != "csv":
+        return None
+    with open(results_file, "rb") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - 4096)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        f.seek(max(0, end - 256))
+        check = f.read(end - max(0, end - 256))
+    return {"offset": end, "check": hashlib.sha1(check).hexdigest()}
+
+
+def read_csv_range(results_file, start, end):
+    """Rows in bytes [start, end) of a CSV, parsed under the file's header."""
+    with open(results_file, "rb") as f:
+        header = f.readline()
+        if start < len(header):
+            start = len(header)
+        f.seek(start)
+        body = f.read(max(0, end - start))
+    if not header.endswith(b"\n") or end < len(header):
+        return pd.DataFrame()
+    return pd.read_csv(io.BytesIO(header + body), encoding=csv_encoding(results_file),
+                       encoding_errors="replace", on_bad_lines="skip")
+
+
+def read_appended(results_file, cube, tail):
+    """Rows added to `results_file` since `cube` was saved, up to `tail`, or
+    None if the file was rewritten rather than appended to."""
+    if source_stamp(results_file)["size"] < cube.stamp["size"]:
+        return None
+
+    saved = cube.csv_tail
+    if (saved is None) != (tail is None):
+        return None
+    if saved is not None:
+        with open(results_file, "rb") as f:
+            start = max(0, saved["offset"] - 256)
+            f.seek(start)
+            check = f.read(saved["offset"] - start)
+        if hashlib.sha1(check).hexdigest() != saved["check"]:
+            return None
+        return read_csv_range(results_file, saved["offset"], tail["offset"])
+
+    df = load_table(results_file)
+    if len(df) < cube.rows:
+        return None
+    return df.iloc[cube.rows:]
+
+
+def read_rows(results_file, stamp):
+    """Every data row of `results_file` within the stamped size."""
+    if sniff_format(results_file) == "csv":
+        return read_csv_range(results_file, 0, stamp["size"])
+    return load_table(results_file)
+
+
+def load_cube(results_file="results.csv", limits_file="limits.csv", stamp=None):
+    """Return the cube for `results_file`, bringing the saved one up to date.
+
+    Rows appended since the cube was saved are folded in incrementally; a
+    CSV is read from the saved byte offset, other formats are sliced past
+    the saved row count. The cube is rebuilt from scratch only when the
+    source shrank or was rewritten, or the limits changed.
+
+    The returned cube also counts an unterminated last CSV line, but the
+    saved one does not, so don't save() it again. Pass the `stamp` taken
+    before reading the file elsewhere to get a cube over exactly the rows
+    read_rows(results_file, stamp) returns.
+    """
+    path = cube_path_for(results_file)
+    limits = load_limits(limits_file)
+    if stamp is None:
+        stamp = source_stamp(results_file)
+
+    # CSVs are only read up to the last complete line within the stamped size
+    tail = csv_tail(results_file, stamp["size"])
+
+    cube = None
+    if os.path.exists(path):
+        cube = YieldCube.load(path, limits)
+        if cube.saved_limits != limits:
+            cube = None
+        elif cube.stamp == stamp:
+            return fold_unterminated(cube, results_file, tail, stamp)
+
+    appended = read_appended(results_file, cube, tail) if cube is not None else None
+    if appended is not None:
+        cube.update(appended)
+    elif tail is not None:
+        cube = YieldCube(limits).update(read_csv_range(results_file, 0, tail["offset"]))
+    else:
+        cube = YieldCube(limits).update(load_table(results_file))
+
+    cube.csv_tail = tail
+    cube.save(path, stamp)
+    return fold_unterminated(cube, results_file, tail, stamp)
+
+
+def fold_unterminated(cube, results_file, tail, stamp):
+    # A last line without a newline is either still being written or the
+    # end of a file that will not grow. It is counted in the cube handed
+    # out but never saved, so it is read again once the line is complete.
+    if tail is not None and tail["offset"] < stamp["size"]:
+        cube.update(read_csv_range(results_file, tail["offset"], stamp["size"]))
+    return cube
+
+
+if __name__ == "__main__":
+    import sys
+
+    results_file = sys.argv[1] if len(sys.argv) > 1 else "results.csv"
+    limits_file = sys.argv[2] if len(sys.argv) > 2 else "limits.csv"
+
+    cube = load_cube(results_file, limits_file)
+    print(f"{len(cube.cells)} cells")
+
+    for by in (("day",), ("parameter",), ("shift", "parameter")):
+        start = time.perf_counter()
+        table = cube.summary(by)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\nby {', '.join(by)} ({elapsed:.1f} ms)")
+        print(table.to_string(float_format="{:.3f}".format))